@@ -1,4 +1,6 @@
+import click
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail
@@ -6,6 +8,9 @@ from flask_cors import CORS
 from celery import Celery
 from config import Config
 from models import db, bcrypt
+from utils.rate_limit import limiter
+from utils.bill_summary import repair_bill_summaries
+from utils.archive import archive_settled_records
 from routes.auth_routes import auth_blueprint
 from routes.bill_routes import bill_blueprint
 from routes.payment_routes import payment_blueprint
@@ -25,9 +30,14 @@ def make_celery(app):
 app = Flask(__name__)
 app.config.from_object(Config)
 
+if app.config["PROXY_FIX_HOPS"]:
+    hops = app.config["PROXY_FIX_HOPS"]
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
 
 db.init_app(app)
 bcrypt.init_app(app)
+limiter.init_app(app)
 jwt = JWTManager(app)
 mail = Mail(app)
 
@@ -46,6 +56,22 @@ app.register_blueprint(bill_blueprint, url_prefix="/bills")
 app.register_blueprint(payment_blueprint, url_prefix="/payments")
 
 
+@app.cli.command("repair-bill-summaries")
+@click.option("--chunk-size", default=500, help="Users checked per transaction.")
+def repair_bill_summaries_command(chunk_size):
+    """Recompute per-user bill summaries and fix any drift."""
+    repaired = repair_bill_summaries(chunk_size=chunk_size)
+    click.echo(f"Repaired {repaired} bill summaries.")
+
+
+@app.cli.command("archive-settled")
+@click.option("--chunk-size", default=None, type=int, help="Rows moved per transaction.")
+def archive_settled_command(chunk_size):
+    """Move old settled payments and paid bills to the archive tables."""
+    payments_moved, bills_moved = archive_settled_records(chunk_size=chunk_size)
+    click.echo(f"Archived {payments_moved} payments and {bills_moved} bills.")
+
+
 def create_tables():
     with app.app_context():
         db.create_all()
@@ -0,0 +1,179 @@
+"""
+Latency benchmark for GET /bills/search on Postgres.
+
+Seeds one user with 100k bills (plus other users' bills as noise), runs a
+mix of exact, prefix, substring and deep-cursor queries through the app,
+prints p50/p99 per query and exits non-zero if the overall p99 misses the
+target. Without the pg_trgm/btree_gin extensions the substring cases are
+reported but left out of the target. The seeded rows are removed afterwards.
+
+    SQLALCHEMY_DATABASE_URI=postgresql://... python benchmarks/bill_search.py
+
+The database needs the current schema, including the bill search indexes
+(a fresh database, or one upgraded with the migrations).
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-jwt-secret-key-long-enough-for-hs256")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import inspect  # noqa: E402
+from app import app  # noqa: E402
+from models import db, User, Bill, BILL_SEARCH_COLUMNS  # noqa: E402
+
+BILL_TYPES = ("Water", "Electricity", "Rent", "Internet", "TV", "Gas", "Insurance", "School Fees")
+PAYBILLS = [str(random.Random(i).randint(100000, 999999)) for i in range(40)]
+
+
+def _user(rng):
+    suffix = uuid.uuid4().hex[:12]
+    return {
+        "id": str(uuid.uuid4()),
+        "full_name": "Benchmark User",
+        "email": f"bench-{suffix}@example.com",
+        "phone": f"+{rng.randint(10 ** 11, 10 ** 12 - 1)}",
+        "password_hash": "!",
+    }
+
+
+def _bills(rng, user_id, count):
+    for _ in range(count):
+        yield {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "bill_type": rng.choice(BILL_TYPES),
+            "amount": rng.randint(100, 20000),
+            "paybill_number": rng.choice(PAYBILLS),
+            "account_number": "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.randint(6, 12))),
+            "due_date": date(2025, 1, 1) + timedelta(days=rng.randint(0, 365)),
+            "status": rng.choice(("Pending", "Pending", "Paid")),
+        }
+
+
+def seed(rng, bills, noise_users, noise_bills, batch_size=5000):
+    users = [_user(rng) for _ in range(noise_users + 1)]
+    db.session.execute(User.__table__.insert(), users)
+
+    owners = [(users[0]["id"], bills)] + [(user["id"], noise_bills) for user in users[1:]]
+    for user_id, count in owners:
+        rows = _bills(rng, user_id, count)
+        while True:
+            batch = [row for _, row in zip(range(batch_size), rows)]
+            if not batch:
+                break
+            db.session.execute(Bill.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(db.text("ANALYZE bills"))
+    db.session.commit()
+    return [user["id"] for user in users]
+
+
+def cleanup(user_ids):
+    db.session.execute(Bill.__table__.delete().where(Bill.user_id.in_(user_ids)))
+    db.session.execute(User.__table__.delete().where(User.id.in_(user_ids)))
+    db.session.commit()
+
+
+def queries(user_id, per_page):
+    """Return {name: (query string, reaches the substring tier)}."""
+    sample = Bill.query.filter(Bill.user_id == user_id).order_by(Bill.id).first()
+    fixed = f"per_page={per_page}"
+    return {
+        "exact bill type (12k matches)": (f"q=water&{fixed}", False),
+        "prefix 1 char": (f"q={sample.account_number[0]}&{fixed}", False),
+        "prefix 2 chars": (f"q={sample.account_number[:2]}&{fixed}", False),
+        "prefix paybill": (f"q={sample.paybill_number[:4]}&{fixed}", False),
+        # Too few exact/prefix matches to fill a page
+        "exact account": (f"q={sample.account_number}&{fixed}", True),
+        "prefix 4 chars": (f"q={sample.account_number[:4]}&{fixed}", True),
+        "substring common": (f"q={sample.account_number[2:5]}&fields=account_number&{fixed}", True),
+        "substring rare": (f"q={sample.account_number[-5:]}&{fixed}", True),
+        "no match": (f"q=qqqqzz&{fixed}", True),
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bills", type=int, default=100_000)
+    parser.add_argument("--noise-users", type=int, default=20)
+    parser.add_argument("--noise-bills", type=int, default=5_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--deep-pages", type=int, default=50)
+    parser.add_argument("--target-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app.config.update(RATELIMIT_ENABLED=False)
+    client = app.test_client()
+
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            sys.exit("Point SQLALCHEMY_DATABASE_URI at a Postgres database.")
+        indexes = {index["name"] for index in inspect(db.engine).get_indexes("bills")}
+        missing = {f"ix_bills_user_lower_{column}" for column in BILL_SEARCH_COLUMNS} - indexes
+        if missing:
+            sys.exit(f"Missing bill search indexes: {sorted(missing)}; upgrade the schema first.")
+        trigram = all(f"ix_bills_user_{column}_trgm" in indexes for column in BILL_SEARCH_COLUMNS)
+
+        print(f"Seeding {args.bills} bills for one user, {args.noise_users}x{args.noise_bills} noise...")
+        user_ids = seed(rng, args.bills, args.noise_users, args.noise_bills)
+        try:
+            headers = {"Authorization": f"Bearer {create_access_token(identity=user_ids[0])}"}
+            cases = queries(user_ids[0], args.per_page)
+
+            # Cursor for a page deep into a large prefix tier
+            deep, _ = cases["prefix 1 char"]
+            cursor = None
+            for _ in range(args.deep_pages):
+                page = client.get(f"/bills/search?{deep}" + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+                cursor = page.get_json()["next_cursor"] or cursor
+            cases[f"prefix 1 char, page {args.deep_pages + 1}"] = (f"{deep}&cursor={cursor}", False)
+
+            timings = {name: [] for name in cases}
+            for query, _ in cases.values():
+                client.get(f"/bills/search?{query}", headers=headers)  # warm up
+            for _ in range(args.iterations):
+                for name, (query, _) in cases.items():
+                    started = time.perf_counter()
+                    response = client.get(f"/bills/search?{query}", headers=headers)
+                    timings[name].append((time.perf_counter() - started) * 1000)
+                    assert response.status_code == 200, response.get_json()
+        finally:
+            db.session.rollback()
+            cleanup(user_ids)
+
+    print(f"\n{'query':<36}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, samples in timings.items():
+        print(f"{name:<36}{percentile(samples, 50):>9.2f}{percentile(samples, 99):>9.2f}")
+
+    if trigram:
+        gated = list(timings)
+    else:
+        # Without the trigram indexes the substring tier scans every bill,
+        # so only the exact/prefix cases say anything about this database.
+        gated = [name for name, (_, substring) in cases.items() if not substring]
+        print("\nWARNING: no trigram indexes (pg_trgm/btree_gin missing); substring-tier cases are not gated")
+
+    overall = percentile([sample for name in gated for sample in timings[name]], 99)
+    print(f"p99 over {len(gated)} gated queries: {overall:.2f} ms (target < {args.target_ms} ms)")
+    sys.exit(0 if overall < args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
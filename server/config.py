@@ -17,6 +17,25 @@ class Config:
     CELERY_BROKER_URL = 'redis://localhost:6379/0'
     CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
+    # Leave unset to keep token buckets in process memory (single worker only).
+    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL')
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    # Number of trusted reverse proxies in front of the app; 0 trusts none
+    # and rate limits on the socket address.
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', '0'))
+    # Per-route (capacity, period_seconds) buckets: "per_user" keys on the
+    # logged-in user, "per_client" on the client address and "per_account"
+    # on the email a login targets.
+    RATELIMITS = {
+        "payments.pay": {"global": (20, 1), "per_user": (5, 60)},
+        "auth.login": {"global": (10, 1), "per_client": (5, 60), "per_account": (10, 300)},
+        "auth.register": {"global": (5, 1), "per_client": (3, 60)},
+    }
+
+    # Settled payments and paid bills older than this move to the archive tables.
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '180'))
+    ARCHIVE_CHUNK_SIZE = int(os.getenv('ARCHIVE_CHUNK_SIZE', '1000'))
+
     
     MPESA_CONSUMER_KEY = os.getenv('MPESA_CONSUMER_KEY')
     MPESA_CONSUMER_SECRET = os.getenv('MPESA_CONSUMER_SECRET')
@@ -0,0 +1,53 @@
+"""add bill search indexes
+
+Revision ID: 3f9c2d7a1b4e
+Revises: b6d2f9c41e58
+Create Date: 2026-10-19 09:30:00.000000
+
+The schema itself is built by db.create_all(), which never adds indexes
+to tables that already exist. This revision backfills them on existing
+deployments; IF NOT EXISTS keeps it a no-op on fresh databases.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2d7a1b4e'
+down_revision = 'b6d2f9c41e58'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = ("account_number", "paybill_number", "bill_type")
+
+
+def upgrade():
+    postgresql = op.get_bind().dialect.name == "postgresql"
+
+    if postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_bills_user_id_id ON bills (user_id, id)")
+
+    # Same definitions as the DDL in models.py
+    collate = ' COLLATE "C"' if postgresql else ""
+    for column in SEARCH_COLUMNS:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_bills_user_lower_{column} "
+            f"ON bills (user_id, (lower({column})){collate}, id)"
+        )
+        if postgresql:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_bills_user_{column}_trgm "
+                f"ON bills USING gin (user_id, {column} gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    for column in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_bills_user_{column}_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_bills_user_lower_{column}")
+    op.execute("DROP INDEX IF EXISTS ix_bills_user_id_id")
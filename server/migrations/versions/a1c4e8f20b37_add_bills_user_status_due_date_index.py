@@ -0,0 +1,31 @@
+"""add bills user/status/due_date index
+
+Revision ID: a1c4e8f20b37
+Revises:
+Create Date: 2026-10-19 09:20:00.000000
+
+Backs the per-user bill summary rebuilds and next-due-date lookups.
+db.create_all() never adds indexes to an existing table, so this
+revision backfills it; IF NOT EXISTS keeps it a no-op on fresh databases.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c4e8f20b37'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_bills_user_status_due_date "
+        "ON bills (user_id, status, due_date)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_bills_user_status_due_date")
@@ -0,0 +1,31 @@
+"""add payments user/paid_at index
+
+Revision ID: b6d2f9c41e58
+Revises: a1c4e8f20b37
+Create Date: 2026-10-19 09:25:00.000000
+
+Backs payment history and the archival job's age scan. The archive
+tables are new and get their indexes from db.create_all(); only the
+existing payments table needs this backfill.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2f9c41e58'
+down_revision = 'a1c4e8f20b37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_payments_user_paid_at "
+        "ON payments (user_id, paid_at)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_payments_user_paid_at")
@@ -2,11 +2,13 @@
 
 
 import uuid
+import logging
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_marshmallow import Marshmallow
 from datetime import datetime
 from marshmallow import fields, validate
+from sqlalchemy import event, DDL
 
 
 db = SQLAlchemy()
@@ -56,6 +58,73 @@ class Bill(db.Model):
 
     user = db.relationship("User", backref="bills")
 
+    __table_args__ = (
+        db.Index("ix_bills_user_status_due_date", "user_id", "status", "due_date"),
+        # Walks a user's bills in id order for keyset-paged substring search
+        db.Index("ix_bills_user_id_id", "user_id", "id"),
+    )
+
+
+BILL_SEARCH_COLUMNS = ("account_number", "paybill_number", "bill_type")
+
+
+def _is_postgresql(ddl, target, bind, **kw):
+    return bind.dialect.name == "postgresql"
+
+
+def _is_not_postgresql(ddl, target, bind, **kw):
+    return bind.dialect.name != "postgresql"
+
+
+def _has_trigram_support(ddl, target, bind, **kw):
+    if bind.dialect.name != "postgresql":
+        return False
+    available = bind.exec_driver_sql(
+        "SELECT count(*) FROM pg_available_extensions WHERE name IN ('pg_trgm', 'btree_gin')"
+    ).scalar()
+    if available < 2:
+        logging.warning("pg_trgm/btree_gin unavailable; bill substring search will not be indexed")
+    return available == 2
+
+
+# Exact and prefix search read (user_id, lower(column), id) in index order.
+# Postgres keeps lower(column) in the "C" collation so range scans and
+# ORDER BY match byte order, the same order SQLite's default collation uses.
+for _column in BILL_SEARCH_COLUMNS:
+    event.listen(
+        Bill.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_bills_user_lower_{_column} "
+            f'ON bills (user_id, (lower({_column})) COLLATE "C", id)'
+        ).execute_if(callable_=_is_postgresql),
+    )
+    event.listen(
+        Bill.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_bills_user_lower_{_column} "
+            f"ON bills (user_id, lower({_column}), id)"
+        ).execute_if(callable_=_is_not_postgresql),
+    )
+
+# Substring search on Postgres uses trigram GIN indexes led by user_id
+# (btree_gin provides the GIN operator class for the plain column).
+for _extension in ("pg_trgm", "btree_gin"):
+    event.listen(
+        Bill.__table__,
+        "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {_extension}").execute_if(callable_=_has_trigram_support),
+    )
+for _column in BILL_SEARCH_COLUMNS:
+    event.listen(
+        Bill.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_bills_user_{_column}_trgm "
+            f"ON bills USING gin (user_id, {_column} gin_trgm_ops)"
+        ).execute_if(callable_=_has_trigram_support),
+    )
 
 
 class Payment(db.Model):
@@ -73,6 +142,62 @@ class Payment(db.Model):
     bill = db.relationship("Bill", backref="payments")
     user = db.relationship("User", backref="payments")
 
+    __table_args__ = (
+        db.Index("ix_payments_user_paid_at", "user_id", "paid_at"),
+    )
+
+
+class ArchivedBill(db.Model):
+    """Paid bills moved out of the hot bills table by the archival job"""
+    __tablename__ = "archived_bills"
+
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    bill_type = db.Column(db.String(50), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    payment_option = db.Column(db.String(50), nullable=False)
+    paybill_number = db.Column(db.String(50), nullable=False)
+    account_number = db.Column(db.String(50), nullable=False)
+    due_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index("ix_archived_bills_user_due_date", "user_id", "due_date"),
+    )
+
+
+class ArchivedPayment(db.Model):
+    """Completed/Failed payments moved out of the hot payments table by the archival job"""
+    __tablename__ = "archived_payments"
+
+    id = db.Column(db.String(36), primary_key=True)
+    # No foreign key: the bill may live in either bills or archived_bills
+    bill_id = db.Column(db.String(36), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    amount_paid = db.Column(db.Float, nullable=False)
+    payment_reference = db.Column(db.String(100), nullable=False)
+    mpesa_receipt_number = db.Column(db.String(100), nullable=True)
+    status = db.Column(db.String(20))
+    paid_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index("ix_archived_payments_user_paid_at", "user_id", "paid_at"),
+    )
+
+
+class UserBillSummary(db.Model):
+    """Per-user bill aggregates, kept in step with the bills table on write"""
+    __tablename__ = "user_bill_summaries"
+
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), primary_key=True)
+    outstanding_total = db.Column(db.Float, nullable=False, default=0)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    next_due_date = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class UserSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -97,6 +222,26 @@ class PaymentSchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
         datetimeformat = "%Y-%m-%dT%H:%M:%S" 
 
+class ArchivedBillSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = ArchivedBill
+        load_instance = False
+        # Serialize exactly like BillSchema so archived rows read the same
+        exclude = ("archived_at",)
+
+class ArchivedPaymentSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = ArchivedPayment
+        load_instance = False
+        datetimeformat = "%Y-%m-%dT%H:%M:%S"
+        # Serialize like PaymentWithBillSchema; the nested bill is attached by the caller
+        exclude = ("archived_at", "bill_id")
+
+class UserBillSummarySchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = UserBillSummary
+        load_instance = False
+
 class PaymentWithBillSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Payment
@@ -113,4 +258,8 @@ bill_schema = BillSchema()
 bills_schema = BillSchema(many=True)
 payment_schema = PaymentSchema()
 payments_schema = PaymentSchema(many=True)
-payment_with_bill_schema = PaymentWithBillSchema() 
\ No newline at end of file
+payment_with_bill_schema = PaymentWithBillSchema()
+user_bill_summary_schema = UserBillSummarySchema()
+archived_bill_schema = ArchivedBillSchema()
+archived_bills_schema = ArchivedBillSchema(many=True)
+archived_payments_schema = ArchivedPaymentSchema(many=True) 
\ No newline at end of file
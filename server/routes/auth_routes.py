@@ -1,13 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_restful import Api, Resource
-from models import db, User, user_schema, UserSchema
+from models import db, User, UserBillSummary, user_schema, UserSchema
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, unset_jwt_cookies
+from utils.rate_limit import rate_limit, submitted_email
 import datetime
 
 auth_blueprint = Blueprint("auth", __name__)
 api = Api(auth_blueprint)
 
 class Register(Resource):
+    @rate_limit("auth.register")
     def post(self):
         data = request.get_json()
 
@@ -29,6 +31,7 @@ class Register(Resource):
         )
 
         db.session.add(new_user)
+        db.session.add(UserBillSummary(user_id=new_user.id))
         db.session.commit()
 
         access_token = create_access_token(identity=new_user.id, expires_delta=datetime.timedelta(days=1))
@@ -37,6 +40,7 @@ class Register(Resource):
         return jsonify({"message": "User registered successfully", "user": user_data, "access_token": access_token, "is_new_user": True})
 
 class Login(Resource):
+    @rate_limit("auth.login", account=submitted_email)
     def post(self):
         data = request.get_json()
         email = data.get("email")
@@ -2,7 +2,12 @@
 
 from flask import Blueprint, request, jsonify
 from flask_restful import Api, Resource
-from models import db, Bill, bill_schema, bills_schema
+from models import db, Bill, Payment, BILL_SEARCH_COLUMNS, ArchivedBill, UserBillSummary, bill_schema, bills_schema, user_bill_summary_schema, archived_bill_schema, archived_bills_schema
+from utils.bill_summary import bill_contribution, track_bill_change, track_bill_changes, rebuild_bill_summary
+from utils.archive import archive_cutoff
+from utils.bill_search import search_bills, encode_cursor, decode_cursor
+from datetime import date
+from sqlalchemy import exists
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
 from marshmallow import ValidationError
@@ -26,7 +31,7 @@ class BillListResource(Resource):
         else:
             bills_data = [data]  
 
-        created_bills = []
+        new_bills = []
         validation_errors = []
 
         for bill_data in bills_data:
@@ -59,7 +64,7 @@ class BillListResource(Resource):
                     due_date=bill['due_date']
                 ) 
                 db.session.add(new_bill)
-                created_bills.append(bill_schema.dump(new_bill))  
+                new_bills.append(new_bill)
 
 
             except ValidationError as err:
@@ -72,6 +77,9 @@ class BillListResource(Resource):
             return {"message": "Some bills failed validation", "errors": validation_errors}, 400
 
         try:
+            # One summary update for the whole batch; it also flushes, so ids are set
+            track_bill_changes(user_id, [(None, bill_contribution(bill)) for bill in new_bills])
+            created_bills = bills_schema.dump(new_bills)
             db.session.commit()
             return {"message": "Bills added successfully", "bills": created_bills}, 201 
         except Exception as e:
@@ -81,9 +89,33 @@ class BillListResource(Resource):
 
     @jwt_required()
     def get(self):
+        """
+        All of the user's bills, or those due within ?from=&to= (YYYY-MM-DD).
+        Archived paid bills are included unless `from` is inside the hot window.
+        """
         user_id = get_jwt_identity()
-        bills = Bill.query.filter_by(user_id=user_id).all()
-        return jsonify(bills_schema.dump(bills))
+        start = request.args.get("from", type=date.fromisoformat)
+        end = request.args.get("to", type=date.fromisoformat)
+
+        def in_range(query, model):
+            query = query.filter_by(user_id=user_id)
+            if start:
+                query = query.filter(model.due_date >= start)
+            if end:
+                query = query.filter(model.due_date <= end)
+            return query
+
+        bills = bills_schema.dump(in_range(Bill.query, Bill).all())
+        if start is None or start < archive_cutoff().date():
+            bills += archived_bills_schema.dump(in_range(ArchivedBill.query, ArchivedBill).all())
+        return jsonify(bills)
+
+
+def _missing_bill_response(bill_id, user_id):
+    """404 for unknown bills, 409 for archived ones, which can't be changed."""
+    if ArchivedBill.query.filter_by(id=bill_id, user_id=user_id).first():
+        return {"message": "Bill is archived and read-only"}, 409
+    return {"message": "Bill not found or unauthorized"}, 404
 
 
 class BillResource(Resource):
@@ -91,18 +123,24 @@ class BillResource(Resource):
     def get(self, bill_id):
         user_id = get_jwt_identity()
         bill = Bill.query.filter_by(id=bill_id, user_id=user_id).first()
-        if not bill:
-            return {"message": "Bill not found or unauthorized"}, 404
-        return jsonify(bill_schema.dump(bill))
+        if bill:
+            return jsonify(bill_schema.dump(bill))
+
+        archived = ArchivedBill.query.filter_by(id=bill_id, user_id=user_id).first()
+        if archived:
+            return jsonify(archived_bill_schema.dump(archived))
+        return {"message": "Bill not found or unauthorized"}, 404
 
     @jwt_required()
     def delete(self, bill_id):
         user_id = get_jwt_identity()
         bill = Bill.query.filter_by(id=bill_id, user_id=user_id).first()
         if not bill:
-            return {"message": "Bill not found or unauthorized"}, 404
+            return _missing_bill_response(bill_id, user_id)
 
+        before = bill_contribution(bill)
         db.session.delete(bill)
+        track_bill_change(user_id, before, None)
         db.session.commit()
         return {"message": "Bill deleted successfully"}, 200
 
@@ -113,7 +151,7 @@ class BillResource(Resource):
 
         bill = Bill.query.filter_by(id=bill_id, user_id=user_id).first()
         if not bill:
-            return {"message": "Bill not found or unauthorized"}, 404
+            return _missing_bill_response(bill_id, user_id)
 
         
         if not all(k in data for k in ("bill_type", "amount", "paybill_number", "account_number", "due_date")):
@@ -133,16 +171,200 @@ class BillResource(Resource):
             return {"message": "Paybill requires both Paybill Number and Account Number"}, 400
 
 
+        before = bill_contribution(bill)
         bill.bill_type = data["bill_type"]
         bill.amount = data["amount"]
         bill.payment_option = "paybill"  
         bill.paybill_number = paybill_number
         bill.account_number = account_number
         bill.due_date = data["due_date"]
+        track_bill_change(user_id, before, bill_contribution(bill))
 
         db.session.commit()
         return {"message": "Bill updated successfully", "bill": bill_schema.dump(bill)}
 
 
+BULK_MAX_IDS = 1000
+BULK_EDITABLE_FIELDS = ("bill_type", "amount", "paybill_number", "account_number", "due_date")
+
+
+def _bulk_ids(data):
+    """Return the de-duplicated list of bill ids in a bulk request body, or None if invalid."""
+    ids = data.get("ids") if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        return None
+    return list(dict.fromkeys(ids))
+
+
+class BillBulkResource(Resource):
+    """
+    Bulk edits for the ManageBills screen. Each request runs a fixed number
+    of statements however many ids it carries, all in one transaction.
+    """
+
+    @jwt_required()
+    def patch(self):
+        data = request.get_json()
+        user_id = get_jwt_identity()
+
+        ids = _bulk_ids(data)
+        if ids is None:
+            return {"message": "ids must be a non-empty list of bill ids"}, 400
+        if len(ids) > BULK_MAX_IDS:
+            return {"message": f"At most {BULK_MAX_IDS} bills can be updated at once"}, 400
+
+        changes = data.get("changes")
+        if not isinstance(changes, dict) or not changes:
+            return {"message": "changes must be a non-empty object"}, 400
+
+        unknown = set(changes) - set(BULK_EDITABLE_FIELDS)
+        if unknown:
+            return {"message": "Unsupported fields", "fields": sorted(unknown)}, 400
+
+        for field in ("paybill_number", "account_number"):
+            if field in changes and not changes[field]:
+                return {"message": "Paybill requires both Paybill Number and Account Number"}, 400
+
+        try:
+            values = bill_schema.load(changes, partial=True)
+        except ValidationError as err:
+            return {"message": "Validation error", "errors": err.messages}, 400
+
+        bills = (
+            db.session.query(Bill.id, Bill.amount, Bill.due_date, Bill.status)
+            .filter(Bill.user_id == user_id, Bill.id.in_(ids))
+            .all()
+        )
+        found = {bill.id for bill in bills}
+
+        summary_changes = []
+        for bill in bills:
+            before = bill_contribution(bill)
+            after = before and (float(values.get("amount", before[0])), values.get("due_date", before[1]))
+            summary_changes.append((before, after))
+
+        try:
+            if found:
+                Bill.query.filter(Bill.user_id == user_id, Bill.id.in_(found)).update(
+                    values, synchronize_session=False
+                )
+                track_bill_changes(user_id, summary_changes)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Bulk bill update error: {e}")
+            return {"message": "Database commit error", "error": str(e)}, 500
+
+        results = [{"id": bill_id, "status": "updated" if bill_id in found else "not_found"} for bill_id in ids]
+        return {"message": f"{len(found)} bills updated", "results": results}, 200
+
+    @jwt_required()
+    def delete(self):
+        data = request.get_json()
+        user_id = get_jwt_identity()
+
+        ids = _bulk_ids(data)
+        if ids is None:
+            return {"message": "ids must be a non-empty list of bill ids"}, 400
+        if len(ids) > BULK_MAX_IDS:
+            return {"message": f"At most {BULK_MAX_IDS} bills can be deleted at once"}, 400
+
+        bills = (
+            db.session.query(
+                Bill.id, Bill.amount, Bill.due_date, Bill.status,
+                exists().where(Payment.bill_id == Bill.id).label("has_payments"),
+            )
+            .filter(Bill.user_id == user_id, Bill.id.in_(ids))
+            .all()
+        )
+        # Bills with payments can't be removed without breaking the payments' foreign key
+        blocked = {bill.id for bill in bills if bill.has_payments}
+        deletable = [bill for bill in bills if not bill.has_payments]
+        deleted = {bill.id for bill in deletable}
+
+        try:
+            if deleted:
+                Bill.query.filter(Bill.user_id == user_id, Bill.id.in_(deleted)).delete(
+                    synchronize_session=False
+                )
+                track_bill_changes(user_id, [(bill_contribution(bill), None) for bill in deletable])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Bulk bill delete error: {e}")
+            return {"message": "Database commit error", "error": str(e)}, 500
+
+        def outcome(bill_id):
+            if bill_id in deleted:
+                return "deleted"
+            return "has_payments" if bill_id in blocked else "not_found"
+
+        results = [{"id": bill_id, "status": outcome(bill_id)} for bill_id in ids]
+        return {"message": f"{len(deleted)} bills deleted", "results": results}, 200
+
+
+SEARCH_MAX_PER_PAGE = 100
+
+
+class BillSearchResource(Resource):
+    @jwt_required()
+    def get(self):
+        """
+        Search the user's bills with ?q= over account number, paybill number
+        and bill type (narrow with ?fields=a,b). Matching is case-insensitive;
+        exact matches rank first, then prefix matches, then substring matches.
+        Queries shorter than 3 characters only match prefixes, since shorter
+        substrings can't use the trigram indexes.
+
+        Pages are fetched by passing the previous response's next_cursor
+        as ?cursor=; it is null on the last page.
+        """
+        user_id = get_jwt_identity()
+        q = request.args.get("q", "").strip()
+        if not q:
+            return {"message": "q is required"}, 400
+
+        fields = request.args.get("fields")
+        fields = [f.strip() for f in fields.split(",")] if fields else list(BILL_SEARCH_COLUMNS)
+        unknown = set(fields) - set(BILL_SEARCH_COLUMNS)
+        if unknown:
+            return {"message": "Unsupported search fields", "fields": sorted(unknown)}, 400
+
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                cursor = decode_cursor(cursor)
+            except ValueError:
+                return {"message": "Invalid cursor"}, 400
+
+        per_page = min(max(request.args.get("per_page", 20, type=int), 1), SEARCH_MAX_PER_PAGE)
+
+        # One extra row tells us whether there is another page
+        results = search_bills(user_id, q.lower(), fields, per_page + 1, cursor or None)
+        has_more = len(results) > per_page
+        results = results[:per_page]
+
+        return jsonify({
+            "results": bills_schema.dump([bill for _, bill in results]),
+            "per_page": per_page,
+            "has_more": has_more,
+            "next_cursor": encode_cursor(results[-1][0]) if has_more else None,
+        })
+
+
+class BillSummaryResource(Resource):
+    @jwt_required()
+    def get(self):
+        user_id = get_jwt_identity()
+        summary = UserBillSummary.query.get(user_id)
+        if not summary:
+            summary = rebuild_bill_summary(user_id)
+            db.session.commit()
+        return jsonify(user_bill_summary_schema.dump(summary))
+
+
 api.add_resource(BillListResource, "/")
+api.add_resource(BillSummaryResource, "/summary")
+api.add_resource(BillBulkResource, "/bulk")
+api.add_resource(BillSearchResource, "/search")
 api.add_resource(BillResource, "/<string:bill_id>")
\ No newline at end of file
@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_restful import Api, Resource
-from models import db, Payment, Bill, User, payment_schema, payments_schema, PaymentWithBillSchema
+from models import db, Payment, Bill, User, ArchivedPayment, payment_schema, payments_schema, PaymentWithBillSchema, archived_payments_schema
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.mpesa import initiate_mpesa_payment
+from utils.rate_limit import rate_limit
+from utils.bill_summary import bill_contribution, track_bill_change
+from utils.archive import archive_cutoff, bills_by_id
+from datetime import date, datetime, time, timedelta
 import logging
 
 payment_blueprint = Blueprint("payments", __name__)
@@ -12,6 +16,7 @@ logging.basicConfig(level=logging.DEBUG)
 
 class PaymentResource(Resource):
     @jwt_required()
+    @rate_limit("payments.pay")
     def post(self):
         data = request.get_json()
         user_id = get_jwt_identity()
@@ -54,13 +59,46 @@ class PaymentResource(Resource):
             return {"message": "Payment failed", "error": response.get("message")}, 400
 
 
+def _filter_paid_at(query, model, start, end):
+    query = query.filter_by(user_id=get_jwt_identity())
+    if start:
+        query = query.filter(model.paid_at >= datetime.combine(start, time.min))
+    if end:
+        query = query.filter(model.paid_at < datetime.combine(end + timedelta(days=1), time.min))
+    return query.order_by(model.paid_at.desc())
+
+
 class PaymentHistoryResource(Resource):
     @jwt_required()
     def get(self):
-        user_id = get_jwt_identity()
-        payments = Payment.query.filter_by(user_id=user_id).order_by(Payment.paid_at.desc()).limit(5).all()
+        """
+        Most recent payments, optionally limited to ?from=YYYY-MM-DD&to=YYYY-MM-DD.
+        Merges in the archive when the range reaches past the archive cutoff
+        and the hot page either isn't full or already holds rows older than
+        the cutoff (old Pending payments, or settled ones not yet archived),
+        since archived payments may be newer than those.
+        """
+        start = request.args.get("from", type=date.fromisoformat)
+        end = request.args.get("to", type=date.fromisoformat)
+        limit = max(1, min(request.args.get("limit", 5, type=int), 100))
+
+        payments = _filter_paid_at(Payment.query, Payment, start, end).limit(limit).all()
+        history = [(payment.paid_at, data) for payment, data in zip(payments, PaymentWithBillSchema(many=True).dump(payments))]
+
+        cutoff = archive_cutoff()
+        reaches_archive = start is None or datetime.combine(start, time.min) < cutoff
+        page_passes_cutoff = len(payments) < limit or payments[-1].paid_at < cutoff
+
+        if reaches_archive and page_passes_cutoff:
+            archived = _filter_paid_at(ArchivedPayment.query, ArchivedPayment, start, end).limit(limit).all()
+            bills = bills_by_id(payment.bill_id for payment in archived)
+            for payment, data in zip(archived, archived_payments_schema.dump(archived)):
+                data["bill"] = bills.get(payment.bill_id)
+                history.append((payment.paid_at, data))
+
+            history.sort(key=lambda item: item[0] or datetime.min, reverse=True)
 
-        return PaymentWithBillSchema(many=True).dump(payments)
+        return [data for _, data in history[:limit]]
 
 
 class MpesaCallbackResource(Resource):
@@ -103,7 +141,9 @@ class MpesaCallbackResource(Resource):
 
                 bill = Bill.query.filter_by(id=payment.bill_id).first()
                 if bill:
+                    before = bill_contribution(bill)
                     bill.status = "Paid"
+                    track_bill_change(bill.user_id, before, bill_contribution(bill))
                 else:
                     logging.error(f"Bill with ID {payment.bill_id} not found.")
                     return {"message": f"Bill with ID {payment.bill_id} not found"}, 404
@@ -0,0 +1,92 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key-long-enough-for-hs256")
+os.environ.setdefault("RATELIMIT_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from models import db  # noqa: E402
+from utils.rate_limit import limiter, InMemoryBucketStore  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, RATELIMIT_ENABLED=False)
+    limiter.store = InMemoryBucketStore()
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """Register a user and return (user_id, auth headers)."""
+    counter = iter(range(1000))
+
+    def _register():
+        n = next(counter)
+        response = client.post("/auth/register", json={
+            "full_name": f"User {n}",
+            "email": f"user{n}@example.com",
+            "phone": f"07000000{n:02d}",
+            "password": "password123",
+        })
+        data = response.get_json()
+        return data["user"]["id"], {"Authorization": f"Bearer {data['access_token']}"}
+
+    return _register
+
+
+@pytest.fixture
+def create_bills(client):
+    def _create_bills(headers, count, **overrides):
+        bills = [
+            {
+                "bill_type": "Water",
+                "amount": 100,
+                "paybill_number": "888880",
+                "account_number": f"ACC{i:04d}",
+                "due_date": f"2025-05-{i % 28 + 1:02d}",
+                **overrides,
+            }
+            for i in range(count)
+        ]
+        response = client.post("/bills/", json=bills, headers=headers)
+        assert response.status_code == 201
+        return [bill["id"] for bill in response.get_json()["bills"]]
+
+    return _create_bills
+
+
+@pytest.fixture
+def count_statements(app):
+    """Context manager yielding a list that collects every SQL statement run inside it."""
+    @contextmanager
+    def _count():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count
@@ -0,0 +1,131 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from models import db, Bill, Payment, ArchivedBill, ArchivedPayment
+from utils.archive import archive_settled_records, archive_cutoff
+
+
+@pytest.fixture
+def archived(client, register):
+    """One settled bill/payment in the archive and one still in the hot tables."""
+    user_id, headers = register()
+    old = Bill(user_id=user_id, bill_type="Water", amount=5, paybill_number="1",
+               account_number="OLD", due_date=date(2020, 1, 1), status="Paid")
+    new = Bill(user_id=user_id, bill_type="Power", amount=7, paybill_number="1",
+               account_number="NEW", due_date=date.today(), status="Paid")
+    db.session.add_all([old, new])
+    db.session.flush()
+    db.session.add_all([
+        Payment(bill_id=old.id, user_id=user_id, amount_paid=5, payment_reference="old",
+                paid_at=datetime(2020, 1, 2)),
+        Payment(bill_id=new.id, user_id=user_id, amount_paid=7, payment_reference="new",
+                paid_at=datetime.utcnow()),
+    ])
+    db.session.commit()
+
+    assert archive_settled_records(chunk_size=1) == (1, 1)
+    return headers
+
+
+def test_archive_moves_only_old_settled_rows(archived):
+    assert [bill.account_number for bill in Bill.query] == ["NEW"]
+    assert [bill.account_number for bill in ArchivedBill.query] == ["OLD"]
+    assert [payment.payment_reference for payment in Payment.query] == ["new"]
+    assert [payment.payment_reference for payment in ArchivedPayment.query] == ["old"]
+
+
+def test_unbounded_bill_list_includes_archive(client, archived):
+    bills = client.get("/bills/", headers=archived).get_json()
+    assert sorted(bill["account_number"] for bill in bills) == ["NEW", "OLD"]
+
+    recent = client.get(f"/bills/?from={date.today().isoformat()}", headers=archived).get_json()
+    assert [bill["account_number"] for bill in recent] == ["NEW"]
+
+
+def test_history_reads_through_to_archive(client, archived):
+    history = client.get("/payments/history", headers=archived).get_json()
+    assert [payment["payment_reference"] for payment in history] == ["new", "old"]
+    assert history[1]["bill"]["account_number"] == "OLD"
+
+
+@pytest.mark.parametrize("limit", ["-1", "0"])
+def test_history_limit_is_at_least_one(client, archived, limit):
+    response = client.get(f"/payments/history?limit={limit}", headers=archived)
+    assert response.status_code == 200
+    assert [payment["payment_reference"] for payment in response.get_json()] == ["new"]
+
+
+def test_history_from_cutoff_day_includes_payments_archived_that_day(client, register):
+    user_id, headers = register()
+    cutoff = archive_cutoff()
+    bill = Bill(user_id=user_id, bill_type="Water", amount=5, paybill_number="1",
+                account_number="EDGE", due_date=cutoff.date() - timedelta(days=1), status="Paid")
+    db.session.add(bill)
+    db.session.flush()
+    # Archived at midnight on the cutoff day, so it sits before the cutoff instant
+    db.session.add(Payment(bill_id=bill.id, user_id=user_id, amount_paid=5, payment_reference="edge",
+                           paid_at=datetime.combine(cutoff.date(), datetime.min.time())))
+    db.session.commit()
+    archive_settled_records(cutoff=cutoff)
+
+    history = client.get(f"/payments/history?from={cutoff.date().isoformat()}", headers=headers).get_json()
+    assert [payment["payment_reference"] for payment in history] == ["edge"]
+
+
+def test_archived_bill_is_readable_by_id(client, archived):
+    bill_id = ArchivedBill.query.one().id
+    response = client.get(f"/bills/{bill_id}", headers=archived)
+    assert response.status_code == 200
+    assert response.get_json()["account_number"] == "OLD"
+
+
+def test_archived_bill_is_read_only(client, archived):
+    bill_id = ArchivedBill.query.one().id
+    body = {"bill_type": "Water", "amount": 1, "paybill_number": "1",
+            "account_number": "OLD", "due_date": "2020-01-01"}
+
+    for response in (client.put(f"/bills/{bill_id}", json=body, headers=archived),
+                     client.delete(f"/bills/{bill_id}", headers=archived)):
+        assert response.status_code == 409
+        assert "archived" in response.get_json()["message"]
+    assert ArchivedBill.query.get(bill_id).amount == 5
+
+
+def test_other_users_archived_bill_is_not_found(client, register, archived):
+    _, other_headers = register()
+    bill_id = ArchivedBill.query.one().id
+    assert client.get(f"/bills/{bill_id}", headers=other_headers).status_code == 404
+    assert client.delete(f"/bills/{bill_id}", headers=other_headers).status_code == 404
+
+
+def test_archived_rows_have_the_same_shape_as_hot_rows(client, archived):
+    bills = client.get("/bills/", headers=archived).get_json()
+    assert len({frozenset(bill) for bill in bills}) == 1
+
+    history = client.get("/payments/history", headers=archived).get_json()
+    assert len({frozenset(payment) for payment in history}) == 1
+    assert len({frozenset(payment["bill"]) for payment in history}) == 1
+
+
+def test_history_merges_archive_behind_old_hot_rows(client, register):
+    user_id, headers = register()
+    bill = Bill(user_id=user_id, bill_type="Water", amount=5, paybill_number="1",
+                account_number="MIX", due_date=date(2020, 1, 1), status="Paid")
+    db.session.add(bill)
+    db.session.flush()
+    db.session.add_all([
+        Payment(bill_id=bill.id, user_id=user_id, amount_paid=5, payment_reference="archived",
+                paid_at=datetime(2021, 1, 1)),
+        # Pending payments are never archived, so these stay in the hot table
+        Payment(bill_id=bill.id, user_id=user_id, amount_paid=5, payment_reference="pending-1",
+                status="Pending", paid_at=datetime(2020, 6, 1)),
+        Payment(bill_id=bill.id, user_id=user_id, amount_paid=5, payment_reference="pending-2",
+                status="Pending", paid_at=datetime(2020, 5, 1)),
+    ])
+    db.session.commit()
+    archive_settled_records()
+    assert ArchivedPayment.query.count() == 1
+
+    history = client.get("/payments/history?limit=2", headers=headers).get_json()
+    assert [payment["payment_reference"] for payment in history] == ["archived", "pending-1"]
@@ -0,0 +1,122 @@
+import pytest
+
+
+def _bill(account_number, paybill_number="400200", bill_type="Water", due_date="2025-05-01"):
+    return {
+        "bill_type": bill_type,
+        "amount": 100,
+        "paybill_number": paybill_number,
+        "account_number": account_number,
+        "due_date": due_date,
+    }
+
+
+@pytest.fixture
+def headers(client, register):
+    _, headers = register()
+    response = client.post("/bills/", json=[
+        _bill("X123", paybill_number="123456", bill_type="Electricity", due_date="2025-05-03"),
+        _bill("ACC123", paybill_number="888880", due_date="2025-05-02"),
+        _bill("zzACC1", paybill_number="555", bill_type="Rent"),
+        _bill("a_b", paybill_number="1", bill_type="Internet"),
+        _bill("axb", paybill_number="2", bill_type="Internet"),
+        _bill("50%off", paybill_number="3", bill_type="Internet"),
+        _bill("500ff", paybill_number="4", bill_type="Internet"),
+    ], headers=headers)
+    assert response.status_code == 201
+    return headers
+
+
+def _search(client, headers, query):
+    response = client.get(f"/bills/search?{query}", headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _accounts(data):
+    return [bill["account_number"] for bill in data["results"]]
+
+
+def test_ranks_exact_then_prefix_then_substring(client, headers):
+    assert _accounts(_search(client, headers, "q=acc123")) == ["ACC123"]
+    assert _accounts(_search(client, headers, "q=acc")) == ["ACC123", "zzACC1"]
+    # X123 is a prefix match on its paybill number, ACC123 only a substring match
+    assert _accounts(_search(client, headers, "q=123")) == ["X123", "ACC123"]
+    # An exact match outranks an earlier-due prefix match
+    assert _accounts(_search(client, headers, "q=123456")) == ["X123"]
+
+
+def test_short_queries_only_match_prefixes(client, headers):
+    assert _accounts(_search(client, headers, "q=ac")) == ["ACC123"]
+    assert _accounts(_search(client, headers, "q=zz")) == ["zzACC1"]
+    assert _accounts(_search(client, headers, "q=cc")) == []
+
+
+def test_like_wildcards_are_escaped(client, headers):
+    assert _accounts(_search(client, headers, "q=a_")) == ["a_b"]
+    assert _accounts(_search(client, headers, "q=50%25")) == ["50%off"]
+    assert _accounts(_search(client, headers, "q=%25off")) == ["50%off"]
+
+
+def test_fields_narrow_the_search(client, headers):
+    assert _accounts(_search(client, headers, "q=123&fields=paybill_number")) == ["X123"]
+    assert _accounts(_search(client, headers, "q=rent&fields=account_number,paybill_number")) == []
+    assert _accounts(_search(client, headers, "q=rent&fields=bill_type")) == ["zzACC1"]
+
+
+@pytest.mark.parametrize("query", ["", "q=", "q=%20", "q=acc&fields=status", "q=acc&fields=account_number,user_id"])
+def test_rejects_bad_requests(client, headers, query):
+    assert client.get(f"/bills/search?{query}", headers=headers).status_code == 400
+
+
+def _walk(client, headers, query):
+    pages, cursor = [], None
+    while True:
+        data = _search(client, headers, query + (f"&cursor={cursor}" if cursor else ""))
+        pages.append(data)
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pagination_spans_prefix_and_substring_tiers(client, headers):
+    pages = _walk(client, headers, "q=acc&per_page=1")
+
+    assert [_accounts(page) for page in pages] == [["ACC123"], ["zzACC1"]]
+    assert [page["has_more"] for page in pages] == [True, False]
+    assert pages[1]["per_page"] == 1
+
+
+def test_cursor_pages_match_a_single_page(client, register):
+    _, headers = register()
+    client.post("/bills/", json=[
+        _bill("xabcx"),
+        _bill("abcz"),
+        _bill("ABC", bill_type="abcd"),
+        _bill("abcd", paybill_number="abca", bill_type="abcb"),
+        _bill("zabc"),
+        _bill("abc"),
+        _bill("nothing"),
+    ], headers=headers)
+
+    everything = _accounts(_search(client, headers, "q=abc&per_page=100"))
+    # Exact matches by id, prefixes by their smallest matching value
+    # (abca < abcz), then substrings by id.
+    assert sorted(everything[:2]) == ["ABC", "abc"]
+    assert everything[2:4] == ["abcd", "abcz"]
+    assert sorted(everything[4:]) == ["xabcx", "zabc"]
+
+    for per_page in (1, 2, 3):
+        pages = _walk(client, headers, f"q=abc&per_page={per_page}")
+        assert [account for page in pages for account in _accounts(page)] == everything
+        assert all(len(page["results"]) == per_page for page in pages[:-1])
+
+
+@pytest.mark.parametrize("cursor", ["nope", "WzEsIG51bGwsICJpZCJd", "WzcsIG51bGwsICJpZCJd"])
+def test_rejects_bad_cursors(client, headers, cursor):
+    assert client.get(f"/bills/search?q=acc&cursor={cursor}", headers=headers).status_code == 400
+
+
+def test_only_searches_own_bills(client, register, headers):
+    _, other_headers = register()
+    assert _search(client, other_headers, "q=acc")["results"] == []
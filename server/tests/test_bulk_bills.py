@@ -0,0 +1,100 @@
+import pytest
+
+from models import db, Bill, Payment, UserBillSummary
+from utils.bill_summary import repair_bill_summaries
+
+
+def _outcomes(response):
+    return {result["id"]: result["status"] for result in response.get_json()["results"]}
+
+
+@pytest.mark.parametrize("method", ["patch", "delete"])
+def test_bulk_statement_count_is_constant(client, register, create_bills, count_statements, method):
+    _, headers = register()
+    ids = create_bills(headers, 202)
+
+    def run(batch):
+        body = {"ids": batch}
+        if method == "patch":
+            body["changes"] = {"amount": 50}
+        with count_statements() as statements:
+            response = getattr(client, method)("/bills/bulk", json=body, headers=headers)
+        assert response.status_code == 200
+        return len(statements)
+
+    assert run(ids[:2]) == run(ids[2:202])
+
+
+def test_bulk_patch_outcomes(client, register, create_bills):
+    _, headers = register()
+    _, other_headers = register()
+    mine = create_bills(headers, 3)
+    theirs = create_bills(other_headers, 1)
+
+    response = client.patch("/bills/bulk", json={
+        "ids": mine[:2] + theirs + ["missing"],
+        "changes": {"amount": 25, "due_date": "2025-01-15"},
+    }, headers=headers)
+
+    assert response.status_code == 200
+    assert _outcomes(response) == {
+        mine[0]: "updated",
+        mine[1]: "updated",
+        theirs[0]: "not_found",
+        "missing": "not_found",
+    }
+    assert {bill.amount for bill in Bill.query.filter(Bill.id.in_(mine[:2]))} == {25}
+    assert Bill.query.get(mine[2]).amount == 100
+    assert Bill.query.get(theirs[0]).amount == 100
+
+
+def test_bulk_delete_outcomes(client, register, create_bills):
+    user_id, headers = register()
+    _, other_headers = register()
+    mine = create_bills(headers, 3)
+    theirs = create_bills(other_headers, 1)
+    db.session.add(Payment(bill_id=mine[1], user_id=user_id, amount_paid=100, payment_reference="ref"))
+    db.session.commit()
+
+    response = client.delete("/bills/bulk", json={
+        "ids": mine[:2] + theirs + ["missing"],
+    }, headers=headers)
+
+    assert response.status_code == 200
+    assert _outcomes(response) == {
+        mine[0]: "deleted",
+        mine[1]: "has_payments",
+        theirs[0]: "not_found",
+        "missing": "not_found",
+    }
+    assert Bill.query.get(mine[0]) is None
+    assert Bill.query.get(mine[1]) is not None
+    assert Bill.query.get(theirs[0]) is not None
+
+
+def test_bulk_changes_keep_summary_consistent(client, register, create_bills):
+    user_id, headers = register()
+    ids = create_bills(headers, 10)
+
+    client.patch("/bills/bulk", json={"ids": ids[:4], "changes": {"amount": 10}}, headers=headers)
+    client.delete("/bills/bulk", json={"ids": ids[4:6]}, headers=headers)
+
+    summary = UserBillSummary.query.get(user_id)
+    assert summary.pending_count == 8
+    assert summary.outstanding_total == 4 * 10 + 4 * 100
+    assert repair_bill_summaries() == 0
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"ids": []},
+    {"ids": "not-a-list"},
+    {"ids": ["a"], "changes": {}},
+    {"ids": ["a"], "changes": {"status": "Paid"}},
+    {"ids": ["a"], "changes": {"account_number": ""}},
+    {"ids": ["a"], "changes": {"amount": "lots"}},
+])
+def test_bulk_patch_rejects_invalid_body(client, register, body):
+    _, headers = register()
+    response = client.patch("/bills/bulk", json=body, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from utils.rate_limit import InMemoryBucketStore
+
+
+@pytest.fixture
+def limited(app):
+    app.config["RATELIMIT_ENABLED"] = True
+    yield app
+    app.config["RATELIMIT_ENABLED"] = False
+
+
+def _login(client, email="nobody@example.com", **kwargs):
+    return client.post("/auth/login", json={"email": email, "password": "wrong-password"}, **kwargs)
+
+
+def test_forwarded_for_header_does_not_pick_the_bucket(client, limited):
+    statuses = [
+        _login(client, email=f"user{i}@example.com", headers={"X-Forwarded-For": f"10.0.0.{i}"}).status_code
+        for i in range(7)
+    ]
+    assert statuses[:5] == [401] * 5
+    assert statuses[5:] == [429, 429]
+
+
+def test_rejection_carries_retry_after(client, limited):
+    for _ in range(5):
+        _login(client)
+    response = _login(client)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_login_is_limited_per_account_across_addresses(client, limited, monkeypatch):
+    monkeypatch.setitem(limited.config, "RATELIMITS", {"auth.login": {"per_account": (3, 300)}})
+    statuses = [
+        _login(client, email="Victim@Example.com ", environ_base={"REMOTE_ADDR": f"10.0.1.{i}"}).status_code
+        for i in range(4)
+    ]
+    assert statuses == [401, 401, 401, 429]
+
+
+def test_in_memory_store_sweeps_refilled_buckets():
+    store = InMemoryBucketStore()
+    for i in range(100):
+        store.consume([(f"client:{i}", 5, 1000.0)])
+    store.consume([("slow", 5, 0.001)])
+    assert len(store._buckets) == 101
+
+    time.sleep(0.01)
+    store._last_sweep -= store.SWEEP_INTERVAL
+    store.consume([("slow", 5, 0.001)])
+    assert list(store._buckets) == ["slow"]
+
+
+def test_payments_are_limited_per_user(client, register, limited):
+    _, headers = register()
+    _, other_headers = register()
+    statuses = [client.post("/payments/pay", json={"bill_id": "missing"}, headers=headers).status_code for _ in range(6)]
+    assert statuses == [404] * 5 + [429]
+    assert client.post("/payments/pay", json={"bill_id": "missing"}, headers=other_headers).status_code == 404
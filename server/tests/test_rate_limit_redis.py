@@ -0,0 +1,74 @@
+import os
+import uuid
+
+import pytest
+
+import redis
+
+from utils.rate_limit import RedisBucketStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A RedisBucketStore on the real Redis at REDIS_URL, or on a Lua-capable fakeredis."""
+    url = os.getenv("REDIS_URL")
+    if url:
+        try:
+            redis.Redis.from_url(url).ping()
+        except redis.exceptions.ConnectionError:
+            pytest.skip(f"Redis at {url} is not reachable")
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(redis.Redis, "from_url", lambda url: fakeredis.FakeRedis(server=server))
+        url = "redis://fake"
+
+    store = RedisBucketStore(url)
+    yield store
+    keys = store._client.keys("ratelimit:test-*")
+    if keys:
+        store._client.delete(*keys)
+
+
+@pytest.fixture
+def key():
+    return f"test-{uuid.uuid4()}"
+
+
+def _state(store, key):
+    tokens, ts = store._client.hmget(f"ratelimit:{key}", "tokens", "ts")
+    return float(tokens), float(ts)
+
+
+def test_allows_until_empty_then_rejects_with_retry_after(store, key):
+    bucket = [(key, 3, 0.1)]
+    assert [store.consume(bucket)[0] for _ in range(3)] == [True, True, True]
+
+    allowed, retry_after = store.consume(bucket)
+    assert allowed is False
+    assert isinstance(retry_after, float)
+    # One token comes back every 10 seconds
+    assert 9 < retry_after <= 10
+
+
+def test_allowed_request_spends_a_token_and_sets_expiry(store, key):
+    assert store.consume([(key, 5, 1.0)]) == (True, 0.0)
+
+    tokens, _ = _state(store, key)
+    assert tokens == pytest.approx(4, abs=0.01)
+    # Expires once the bucket would have refilled: capacity / rate + 1 seconds
+    assert 0 < store._client.ttl(f"ratelimit:{key}") <= 6
+
+
+def test_rejection_spends_no_tokens_from_any_bucket(store, key):
+    roomy, empty = f"{key}-roomy", f"{key}-empty"
+    assert store.consume([(empty, 1, 0.01)])[0]
+    assert store.consume([(roomy, 10, 0.01)])[0]
+    before = _state(store, roomy)
+
+    allowed, retry_after = store.consume([(roomy, 10, 0.01), (empty, 1, 0.01)])
+
+    assert allowed is False
+    assert retry_after > 90
+    assert _state(store, roomy) == before
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+import logging
+from flask import current_app
+from sqlalchemy import insert, delete, select, exists
+from models import db, Bill, Payment, ArchivedBill, ArchivedPayment, BillSchema, ArchivedBillSchema
+
+SETTLED_PAYMENT_STATUSES = ("Completed", "Failed")
+
+
+def archive_cutoff():
+    """Oldest timestamp still guaranteed to be in the hot tables."""
+    return datetime.utcnow() - timedelta(days=current_app.config["ARCHIVE_AFTER_DAYS"])
+
+
+def _move_rows(model, archive_model, ids):
+    table, archive_table = model.__table__, archive_model.__table__
+    columns = [column.name for column in table.columns]
+
+    db.session.execute(
+        insert(archive_table).from_select(
+            columns, select(*[table.c[name] for name in columns]).where(table.c.id.in_(ids))
+        )
+    )
+    db.session.execute(delete(table).where(table.c.id.in_(ids)))
+
+
+def _archive_in_chunks(model, archive_model, query, chunk_size):
+    moved = 0
+    while True:
+        ids = [row_id for (row_id,) in query.limit(chunk_size)]
+        if not ids:
+            break
+        try:
+            _move_rows(model, archive_model, ids)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Archiving {model.__tablename__} failed after {moved} rows: {e}")
+            raise
+        moved += len(ids)
+        logging.info(f"Archived {moved} {model.__tablename__} rows so far")
+    return moved
+
+
+def archive_settled_records(cutoff=None, chunk_size=None):
+    """
+    Move Completed/Failed payments and Paid bills older than `cutoff` into
+    the archive tables, one committed transaction per chunk.
+    Payments go first; a bill is only moved once no hot payment points at it.
+    Returns (payments_moved, bills_moved).
+    """
+    cutoff = cutoff or archive_cutoff()
+    chunk_size = chunk_size or current_app.config["ARCHIVE_CHUNK_SIZE"]
+
+    payments = db.session.query(Payment.id).filter(
+        Payment.status.in_(SETTLED_PAYMENT_STATUSES),
+        Payment.paid_at < cutoff,
+    )
+    payments_moved = _archive_in_chunks(Payment, ArchivedPayment, payments, chunk_size)
+
+    bills = db.session.query(Bill.id).filter(
+        Bill.status == "Paid",
+        Bill.due_date < cutoff.date(),
+        ~exists().where(Payment.bill_id == Bill.id),
+    )
+    bills_moved = _archive_in_chunks(Bill, ArchivedBill, bills, chunk_size)
+
+    return payments_moved, bills_moved
+
+
+def bills_by_id(bill_ids):
+    """Serialized bills keyed by id, looked up in the hot table then the archive."""
+    bill_ids = set(bill_ids)
+    found = {}
+    if not bill_ids:
+        return found
+
+    for bill in Bill.query.filter(Bill.id.in_(bill_ids)):
+        found[bill.id] = BillSchema().dump(bill)
+
+    missing = bill_ids - found.keys()
+    if missing:
+        for bill in ArchivedBill.query.filter(ArchivedBill.id.in_(missing)):
+            found[bill.id] = ArchivedBillSchema().dump(bill)
+
+    return found
@@ -0,0 +1,126 @@
+import base64
+import heapq
+import json
+from sqlalchemy import func, or_, and_, not_, tuple_
+from models import db, Bill
+
+# Sorts after every other character, so [term, term + MAX_CHAR) is the set
+# of strings starting with term under byte-wise ordering.
+MAX_CHAR = "\U0010ffff"
+
+EXACT, PREFIX, SUBSTRING = 0, 1, 2
+
+
+def encode_cursor(cursor):
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(value):
+    """Parse a next_cursor value back into (tier, key, bill_id); ValueError if malformed."""
+    try:
+        tier, key, bill_id = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if tier not in (EXACT, PREFIX, SUBSTRING) or not isinstance(bill_id, str):
+        raise ValueError("Invalid cursor")
+    if (tier == PREFIX) != isinstance(key, str):
+        raise ValueError("Invalid cursor")
+    return tier, key, bill_id
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_key(column, dialect):
+    # Must match the ix_bills_user_lower_* index expressions exactly
+    key = func.lower(column)
+    return key.collate("C") if dialect == "postgresql" else key
+
+
+def _starts_with(key, term):
+    return and_(key >= term, key < term + MAX_CHAR)
+
+
+def _substring_match(column, term, dialect):
+    pattern = f"%{_escape_like(term)}%"
+    if dialect == "postgresql":
+        # Served by the (user_id, column gin_trgm_ops) index
+        return column.ilike(pattern, escape="\\")
+    return func.lower(column).like(pattern, escape="\\")
+
+
+def _merge(streams, limit):
+    """Merge per-column (sort_key, bill) streams that are already sorted, dropping duplicates."""
+    merged, seen = [], set()
+    for sort_key, bill in heapq.merge(*streams, key=lambda item: item[0]):
+        if bill.id not in seen:
+            seen.add(bill.id)
+            merged.append((sort_key, bill))
+            if len(merged) == limit:
+                break
+    return merged
+
+
+def search_bills(user_id, term, fields, limit, cursor=None):
+    """
+    Return up to `limit` of the user's bills matching `term` (already
+    lowercased) as (cursor, bill) pairs in rank order, starting after
+    `cursor`. Each cursor resumes the search right after its bill.
+
+    Tiers, each read in an order its index returns directly:
+    - exact: lower(column) == term, by id
+    - prefix: lower(column) starts with term, by (matched value, id).
+      A bill matching in several columns is listed under its smallest
+      matched value.
+    - substring: contains term, by id. Only for terms of 3+ characters,
+      the shortest a trigram index can serve.
+    """
+    dialect = db.session.get_bind().dialect.name
+    columns = [getattr(Bill, field) for field in fields]
+    keys = [_search_key(column, dialect) for column in columns]
+    user_bills = Bill.query.filter(Bill.user_id == user_id)
+    tier, after_key, after_id = cursor or (EXACT, None, None)
+    results = []
+
+    if tier == EXACT:
+        streams = []
+        for key in keys:
+            query = user_bills.filter(key == term)
+            if after_id is not None:
+                query = query.filter(Bill.id > after_id)
+            streams.append([(bill.id, bill) for bill in query.order_by(Bill.id).limit(limit)])
+        results += [((EXACT, None, bill.id), bill) for _, bill in _merge(streams, limit)]
+        tier, after_key, after_id = PREFIX, None, None
+
+    if tier == PREFIX and len(results) < limit:
+        need = limit - len(results)
+        not_exact = not_(or_(*[key == term for key in keys]))
+        streams = []
+        for i, key in enumerate(keys):
+            # Skip bills that rank under another column, so every bill
+            # appears in exactly one stream.
+            ranked_elsewhere = [
+                and_(_starts_with(other, term), or_(other < key, and_(other == key, j < i)))
+                for j, other in enumerate(keys) if j != i
+            ]
+            query = user_bills.filter(key > term, key < term + MAX_CHAR, not_exact)
+            if ranked_elsewhere:
+                query = query.filter(not_(or_(*ranked_elsewhere)))
+            if after_id is not None:
+                query = query.filter(tuple_(key, Bill.id) > tuple_(after_key, after_id))
+            rows = query.add_columns(key).order_by(key, Bill.id).limit(need)
+            streams.append([((value, bill.id), bill) for bill, value in rows])
+        results += [((PREFIX, value, bill.id), bill) for (value, _), bill in _merge(streams, need)]
+        tier, after_key, after_id = SUBSTRING, None, None
+
+    if tier == SUBSTRING and len(results) < limit and len(term) >= 3:
+        prefix_any = or_(*[_starts_with(key, term) for key in keys])
+        substring_any = or_(*[_substring_match(column, term, dialect) for column in columns])
+        query = user_bills.filter(substring_any, not_(prefix_any))
+        if after_id is not None:
+            query = query.filter(Bill.id > after_id)
+        bills = query.order_by(Bill.id).limit(limit - len(results))
+        results += [((SUBSTRING, None, bill.id), bill) for bill in bills]
+
+    return results
@@ -0,0 +1,187 @@
+from datetime import date
+import logging
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, Bill, User, UserBillSummary
+
+
+def _as_date(value):
+    # Bill.due_date is still a raw string until the session flushes it
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def bill_contribution(bill):
+    """
+    Return the (amount, due_date) a bill adds to its owner's summary,
+    or None when the bill is settled and no longer outstanding.
+    """
+    if bill is None or bill.status not in (None, "Pending"):
+        return None
+    return float(bill.amount), _as_date(bill.due_date)
+
+
+def _aggregate(user_ids):
+    rows = (
+        db.session.query(
+            Bill.user_id,
+            func.coalesce(func.sum(Bill.amount), 0),
+            func.count(Bill.id),
+            func.min(Bill.due_date),
+        )
+        .filter(Bill.user_id.in_(user_ids), Bill.status == "Pending")
+        .group_by(Bill.user_id)
+        .all()
+    )
+    return {user_id: (float(total), count, next_due) for user_id, total, count, next_due in rows}
+
+
+def _next_due_date(user_id):
+    return (
+        db.session.query(func.min(Bill.due_date))
+        .filter(Bill.user_id == user_id, Bill.status == "Pending")
+        .scalar()
+    )
+
+
+def _insert_empty_summary(user_id):
+    """
+    Insert a zeroed summary row unless one already exists, without failing
+    when a concurrent request inserts it first.
+    Returns True when this call created the row.
+    """
+    dialect = db.session.get_bind().dialect.name
+    insert = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}.get(dialect)
+    if insert is None:
+        db.session.add(UserBillSummary(user_id=user_id, outstanding_total=0, pending_count=0))
+        db.session.flush()
+        return True
+
+    result = db.session.execute(
+        insert(UserBillSummary.__table__)
+        .values(user_id=user_id, outstanding_total=0, pending_count=0)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    return result.rowcount == 1
+
+
+def rebuild_bill_summary(user_id):
+    """Recompute one user's summary from the bills table. Does not commit."""
+    total, count, next_due = _aggregate([user_id]).get(user_id, (0.0, 0, None))
+    summary = UserBillSummary.query.get(user_id)
+    if summary is None:
+        _insert_empty_summary(user_id)
+        summary = UserBillSummary.query.get(user_id)
+
+    summary.outstanding_total = total
+    summary.pending_count = count
+    summary.next_due_date = next_due
+    return summary
+
+
+def track_bill_change(user_id, before, after):
+    """
+    Apply a single bill's change to its owner's summary.
+
+    `before` and `after` are bill_contribution() values taken around the
+    change, and the change must already be applied to the session.
+    Does not commit.
+    """
+    track_bill_changes(user_id, [(before, after)])
+
+
+def track_bill_changes(user_id, changes):
+    """
+    Apply a batch of (before, after) bill changes for one user with a single
+    summary update. Counters are incremented in SQL so concurrent writers
+    don't lose updates. Does not commit.
+    """
+    changes = [(before, after) for before, after in changes if before != after]
+    if not changes:
+        return
+
+    summary = UserBillSummary.query.get(user_id)
+    if summary is None:
+        # Users created before summaries existed. Whoever inserts the row
+        # rebuilds it from the bills table, which already includes these
+        # changes; a request that lost the race increments the winner's row.
+        if _insert_empty_summary(user_id):
+            rebuild_bill_summary(user_id)
+            return
+        summary = UserBillSummary.query.get(user_id)
+
+    removed = [before for before, _ in changes if before]
+    added = [after for _, after in changes if after]
+    amount_delta = sum(amount for amount, _ in added) - sum(amount for amount, _ in removed)
+    count_delta = len(added) - len(removed)
+    next_due = summary.next_due_date
+
+    # Work out the new due date before touching the counters, so the
+    # re-query's autoflush can't split the summary into two UPDATEs.
+    earliest_removed = min((due_date for _, due_date in removed), default=None)
+    earliest_added = min((due_date for _, due_date in added), default=None)
+    if earliest_removed and (next_due is None or earliest_removed <= next_due):
+        next_due = _next_due_date(user_id)
+    elif earliest_added and (next_due is None or earliest_added < next_due):
+        next_due = earliest_added
+
+    summary.outstanding_total = UserBillSummary.outstanding_total + amount_delta
+    summary.pending_count = UserBillSummary.pending_count + count_delta
+    summary.next_due_date = next_due
+
+    # Flush now so a second change in this session increments on top of this one
+    db.session.flush()
+
+
+def repair_bill_summaries(chunk_size=500):
+    """
+    Walk every user in chunks, compare their summary against the bills
+    table and fix any drift. Commits once per chunk.
+    Returns the number of summaries that were created or corrected.
+    """
+    repaired = 0
+    last_id = ""
+
+    while True:
+        user_ids = [
+            user_id for (user_id,) in db.session.query(User.id)
+            .filter(User.id > last_id)
+            .order_by(User.id)
+            .limit(chunk_size)
+        ]
+        if not user_ids:
+            break
+
+        # Lock the summaries first so incremental writers wait for this chunk
+        summaries = {
+            summary.user_id: summary for summary in UserBillSummary.query
+            .filter(UserBillSummary.user_id.in_(user_ids))
+            .with_for_update()
+        }
+        actual = _aggregate(user_ids)
+
+        for user_id in user_ids:
+            total, count, next_due = actual.get(user_id, (0.0, 0, None))
+            summary = summaries.get(user_id)
+            if summary is None:
+                _insert_empty_summary(user_id)
+                summary = UserBillSummary.query.get(user_id)
+            elif (
+                abs(summary.outstanding_total - total) < 0.005
+                and summary.pending_count == count
+                and summary.next_due_date == next_due
+            ):
+                continue
+
+            logging.info(f"Repairing bill summary for user {user_id}")
+            summary.outstanding_total = total
+            summary.pending_count = count
+            summary.next_due_date = next_due
+            repaired += 1
+
+        db.session.commit()
+        last_id = user_ids[-1]
+
+    return repaired
@@ -0,0 +1,203 @@
+import time
+import threading
+import logging
+from functools import wraps
+from math import ceil
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+
+# Checks every bucket first and only spends tokens when all of them allow the
+# request, so a user rejected by their own bucket does not drain the global one.
+# KEYS are bucket keys, ARGV holds (capacity, refill_per_second) pairs.
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local retry_after = 0
+local levels = {}
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        retry_after = math.max(retry_after, (1 - tokens) / rate)
+    end
+end
+
+if retry_after > 0 then
+    return {0, tostring(retry_after)}
+end
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    redis.call('HSET', key, 'tokens', levels[i] - 1, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return {1, '0'}
+"""
+
+
+class InMemoryBucketStore:
+    """Token buckets kept in process memory, for single-worker deployments."""
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self):
+        # key -> (tokens, ts, capacity, rate)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _sweep(self, now):
+        # A bucket that has refilled to capacity is the same as a missing one,
+        # so dropping it keeps memory bounded by recently active keys.
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if bucket[0] + (now - bucket[1]) * bucket[3] < bucket[2]
+        }
+        self._last_sweep = now
+
+    def consume(self, buckets):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= self.SWEEP_INTERVAL:
+                self._sweep(now)
+
+            levels = []
+            retry_after = 0.0
+            for key, capacity, rate in buckets:
+                tokens, ts, _, _ = self._buckets.get(key, (capacity, now, capacity, rate))
+                tokens = min(capacity, tokens + (now - ts) * rate)
+                levels.append(tokens)
+                if tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) / rate)
+
+            if retry_after > 0:
+                return False, retry_after
+
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens - 1, now, capacity, rate)
+            return True, 0.0
+
+
+class RedisBucketStore:
+    """Token buckets kept in Redis and updated atomically by a Lua script."""
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, buckets):
+        keys = [f"ratelimit:{key}" for key, _, _ in buckets]
+        args = []
+        for _, capacity, rate in buckets:
+            args.extend([capacity, rate])
+
+        allowed, retry_after = self._script(keys=keys, args=args)
+        return bool(allowed), float(retry_after)
+
+
+class RateLimiter:
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RATELIMIT_ENABLED", True)
+        app.config.setdefault("RATELIMIT_STORAGE_URL", None)
+        app.config.setdefault("RATELIMITS", {})
+
+        url = app.config["RATELIMIT_STORAGE_URL"]
+        self.store = RedisBucketStore(url) if url else InMemoryBucketStore()
+        app.extensions["rate_limiter"] = self
+
+    def check(self, route, account=None):
+        """
+        Return (allowed, retry_after_seconds) for one request on `route`.
+
+        Bucket kinds: "global" for the whole route, "per_user" for the JWT
+        identity, "per_client" for the client address and "per_account" for
+        the `account` value the endpoint is acting on.
+        """
+        limits = current_app.config["RATELIMITS"].get(route)
+        if not current_app.config["RATELIMIT_ENABLED"] or not limits:
+            return True, 0.0
+
+        buckets = []
+        if "global" in limits:
+            capacity, period = limits["global"]
+            buckets.append((f"{route}:global", capacity, capacity / period))
+        if "per_user" in limits:
+            user = get_jwt_identity()
+            if user:
+                capacity, period = limits["per_user"]
+                buckets.append((f"{route}:user:{user}", capacity, capacity / period))
+        if "per_client" in limits:
+            client = remote_identity()
+            if client:
+                capacity, period = limits["per_client"]
+                buckets.append((f"{route}:client:{client}", capacity, capacity / period))
+        if "per_account" in limits and account:
+            capacity, period = limits["per_account"]
+            buckets.append((f"{route}:account:{account}", capacity, capacity / period))
+
+        if not buckets:
+            return True, 0.0
+
+        try:
+            return self.store.consume(buckets)
+        except Exception as e:
+            # Throttling must never take the endpoint down with it.
+            logging.error(f"Rate limiter error on {route}: {e}")
+            return True, 0.0
+
+
+limiter = RateLimiter()
+
+
+def remote_identity():
+    # Never read X-Forwarded-For here; ProxyFix rewrites remote_addr when
+    # PROXY_FIX_HOPS is configured, so the client can't pick its own bucket.
+    return request.remote_addr
+
+
+def submitted_email():
+    data = request.get_json(silent=True)
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def rate_limit(route, account=None):
+    """
+    Reject requests on `route` with a 429 once one of its token buckets is
+    empty. Limits come from the RATELIMITS config entry for `route`, as
+    (capacity, period_seconds) tuples; see RateLimiter.check for the kinds.
+    `account` optionally keys a bucket on the target of the request (e.g.
+    the email being logged into) so it can't be attacked from many clients.
+    Place it below @jwt_required() on routes with a "per_user" limit.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            allowed, retry_after = limiter.check(route, account() if account else None)
+            if not allowed:
+                retry_after = max(1, ceil(retry_after))
+                logging.warning(f"Rate limit exceeded on {route}, retry after {retry_after}s")
+                return (
+                    {"message": "Too many requests, please try again later", "retry_after": retry_after},
+                    429,
+                    {"Retry-After": str(retry_after)},
+                )
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator